@@ -1,21 +1,35 @@
 from fastapi import APIRouter, WebSocket, HTTPException, Depends, Request, Response, BackgroundTasks
+from twilio.request_validator import RequestValidator
 from ..services.twilio_service import TwilioService
 from ..services.sarvam_service import SarvamAIService
 from ..services.email_service import email_service
 from ..services.intelligence_service import IntelligenceService
 from ..utils import audio_utils
-import base64
-import json
+import binascii
+
+# SIMD base64 (pybase64 dispatches to AVX2/SSSE3) for the multi-hundred-KB
+# TTS buffers; stdlib's scalar codec is the drop-in fallback. Per-frame
+# payloads keep using binascii directly - they're 160 bytes
+try:
+    from pybase64 import b64decode as _b64decode, b64encode as _b64encode
+except ImportError:  # pragma: no cover
+    from base64 import b64decode as _b64decode, b64encode as _b64encode
+import orjson
+import os
 from typing import Dict, List, Optional
-from twilio.twiml.voice_response import VoiceResponse, Connect, Start
+import html
 import logging
+import urllib.parse
 import asyncio
+import contextlib
 import time
 import re
+from dataclasses import dataclass, field
 
-# Configure logging
+# Configure logging - level comes from the environment so production can
+# run at INFO/WARNING without per-frame DEBUG formatting cost
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -24,28 +38,311 @@ router = APIRouter()
 twilio_service = TwilioService()
 sarvam_service = SarvamAIService()
 
-# Store active WebSocket connections and their state
-active_connections: Dict[str, WebSocket] = {}
-audio_buffers: Dict[str, List[bytes]] = {}
-processing_locks: Dict[str, bool] = {}
-background_tasks: Dict[str, asyncio.Task] = {}
-speech_states: Dict[str, dict] = {}  # Track speech state for each connection
+@dataclass(slots=True)
+class Connection:
+    """Per-call state, previously spread across six parallel dicts.
+
+    One struct per connection means a single hash lookup per inbound frame
+    and cleanup is a single pop that cannot miss a key.
+    """
+    websocket: WebSocket
+    buffer: bytearray = field(default_factory=bytearray)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    speech: dict = field(default_factory=dict)  # speech_start / last_speech timestamps
+    session: dict = field(default_factory=dict)  # phone, email, topics, mood, crisis_detected...
+    task: Optional[asyncio.Task] = None
+    # ~10s of 20ms media frames between the receive loop and the VAD worker
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=500))
+    vad_task: Optional[asyncio.Task] = None
+    # Second-chance reference bits for the idle sweeper: set on every media
+    # frame, cleared one per sweep; both clear means the stream went dead
+    ref_a: bool = True
+    ref_b: bool = True
+
+# Active WebSocket connections and their state
+connections: Dict[int, Connection] = {}
+
+# Concurrency cap: past this many simultaneous calls, new callers get a
+# polite busy message instead of degrading audio quality for everyone
+MAX_CONCURRENT_CALLS = int(os.getenv("MAX_CONCURRENT_CALLS", "50"))
+_BUSY_TWIML = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Response><Say>All lines are busy right now. Please try again in a few minutes.</Say>'
+    '<Hangup /></Response>'
+)
+
+# Bounded queue feeding a small pool of email workers. Emails are fire-and
+# forget from the call path's perspective, but the workers keep threadpool
+# usage bounded and surface failures instead of losing them with the task
+_EMAIL_QUEUE: asyncio.Queue = asyncio.Queue(maxsize=1000)
+_EMAIL_WORKER_COUNT = 2
+_email_workers: List[asyncio.Task] = []
+
+async def _email_worker():
+    while True:
+        fn, args = await _EMAIL_QUEUE.get()
+        try:
+            await asyncio.to_thread(fn, *args)
+        except Exception:
+            logger.exception(f"Email send failed: {fn.__name__}")
+
+def _enqueue_email(fn, *args) -> None:
+    """Queue an email send for the background workers (started lazily so
+    the queue can be created at import time without a running loop)"""
+    if not _email_workers:
+        _email_workers.extend(
+            asyncio.create_task(_email_worker()) for _ in range(_EMAIL_WORKER_COUNT)
+        )
+    try:
+        _EMAIL_QUEUE.put_nowait((fn, args))
+    except asyncio.QueueFull:
+        logger.error(f"Email queue full - dropping {fn.__name__}")
+
+def _log_task_exception(task: asyncio.Task) -> None:
+    """Done-callback for background processing tasks: surface exceptions
+    that would otherwise be swallowed by the event loop"""
+    if not task.cancelled() and task.exception():
+        logger.error(f"Background audio task failed: {task.exception()}")
 
-# Session tracking for email follow-ups
-session_data: Dict[str, dict] = {}  # Stores: phone, email, topics, mood, crisis_detected
+# The event loop holds only weak references to tasks, so a fire-and-forget
+# create_task can be garbage-collected mid-flight. _spawn keeps a strong
+# reference until the task completes and logs any exception
+_background_tasks: set = set()
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    task.add_done_callback(_log_task_exception)
+    return task
 
 # Constants for audio processing
 MIN_SPEECH_DURATION_MS = 1000  # Minimum speech duration (1 second)
 MAX_SPEECH_DURATION_MS = 15000  # Maximum speech duration (15 seconds)
 SILENCE_DURATION_MS = 1000  # Duration of silence to mark end of speech
+MAX_BUFFER_BYTES = MAX_SPEECH_DURATION_MS * 8  # Hard cap per connection (8 mu-law bytes per ms)
+
+# Static greeting played at the top of every inbound call. Rendered through
+# Sarvam TTS once and then served from memory, so Twilio can <Play> a cached
+# clip instead of re-synthesizing the same sentence per call
+GREETING_TEXT = "Welcome to MindBloom AI. I'm Artika, your mental wellness companion. I'm here to listen and support you. Please feel free to share what's on your mind in any language."
+_greeting_audio: Optional[bytes] = None  # rendered WAV bytes
+_greeting_render_task: Optional[asyncio.Task] = None
+
+async def _render_greeting() -> Optional[bytes]:
+    global _greeting_audio
+    if _greeting_audio is None:
+        response_audio = await sarvam_service.text_to_speech(text=GREETING_TEXT)
+        if response_audio:
+            _greeting_audio = _b64decode(response_audio)
+            logger.info("Greeting audio rendered and cached")
+    return _greeting_audio
+
+# Canned responses - deterministic strings whose synthesized audio never
+# changes, so their mu-law output can be cached per language
+CRISIS_RESPONSE = "I hear you, and I want you to know that you matter. What you're feeling right now is temporary, even though it doesn't feel that way. Please, let's talk. If things feel too overwhelming, please reach out to iCALL at 9152987821 or Vandrevala Foundation at 1860-2662-345. I'm here with you right now."
+BREATHING_INTRO = "Of course, let's do a calming breathing exercise together. Get comfortable, close your eyes if you like, and follow along with this one-minute guided breathing."
+BREATHING_FOLLOWUP = "Take a moment to notice how you feel now. Your body and mind have had a chance to reset. How are you feeling?"
+EMAIL_RETRY_PROMPT = "I didn't quite catch that email address. Could you please share your email address again? For example, yourname at gmail dot com."
+APPOINTMENT_EMAIL_PROMPT = "That's wonderful! Taking this step shows real strength. Could you please share your email address so I can send you the booking link?"
+APPOINTMENT_DECLINED_RESPONSE = "That's completely okay. Remember, I'm always here whenever you need to talk. Is there anything else on your mind that you'd like to share?"
+BOOKING_EMAIL_PROMPT = "I'd be happy to help you book an appointment with a professional therapist. Could you please share your email address so I can send you the booking link?"
+FAREWELL_RESPONSE = "Thank you so much for sharing with me today. Remember, you're stronger than you know, and I'm always here whenever you need to talk. Take care of yourself, and don't hesitate to reach out anytime. Wishing you peace and wellness. Goodbye!"
+
+_CANNED_RESPONSES = frozenset({
+    CRISIS_RESPONSE,
+    BREATHING_INTRO,
+    BREATHING_FOLLOWUP,
+    EMAIL_RETRY_PROMPT,
+    APPOINTMENT_EMAIL_PROMPT,
+    APPOINTMENT_DECLINED_RESPONSE,
+    BOOKING_EMAIL_PROMPT,
+    FAREWELL_RESPONSE,
+})
+
+# Cache of pre-rendered mu-law audio for canned responses, keyed by
+# (english_text, target_language)
+_TTS_CACHE: Dict[tuple, bytes] = {}
+
+# Breathing exercise audio, base64-encoded once: repeat requests then skip
+# both the MP3 conversion (cached inside audio_utils) and the per-play
+# encode, leaving only frame formatting and send_text in the play path
+_breathing_b64: Optional[str] = None
+
+async def _get_breathing_b64() -> Optional[str]:
+    global _breathing_b64
+    if _breathing_b64 is None:
+        breathing_audio = await asyncio.to_thread(audio_utils.load_breathing_audio)
+        if breathing_audio:
+            _breathing_b64 = _b64encode(breathing_audio).decode('ascii')
+    return _breathing_b64
+
+# Spoken-email confirmation: translate @ and . in one pass, then join the
+# characters so TTS reads the address out letter by letter
+_SPELL_MAP = str.maketrans({'@': ' at ', '.': ' dot '})
+
+def _spell_out_email(email: str) -> str:
+    return " ".join(email.translate(_SPELL_MAP))
+
+# Outbound chunking: multiples of 3 bytes so each chunk maps to a clean,
+# padding-free slice of the base64 encoding (3 bytes -> 4 chars). The first
+# chunk is small (~20ms) so Twilio can start playback immediately, then the
+# size doubles up to the steady-state ~80ms chunk
+MULAW_CHUNK_SIZE = 642  # ~80ms of 8kHz mu-law audio
+MULAW_FIRST_CHUNK_SIZE = 162  # ~20ms, for fast time-to-first-audio
+B64_CHUNK_SIZE = MULAW_CHUNK_SIZE * 4 // 3
+B64_FIRST_CHUNK_SIZE = MULAW_FIRST_CHUNK_SIZE * 4 // 3
+
+async def _render_speech(english_text: str, target_language: str) -> Optional[bytes]:
+    """Translate (if needed), synthesize, and mu-law-convert a response.
+
+    Canned responses hit an exact-match cache, skipping the translate and
+    TTS API calls entirely after the first synthesis per language.
+    """
+    cache_key = (english_text, target_language)
+    cacheable = english_text in _CANNED_RESPONSES
+    if cacheable and cache_key in _TTS_CACHE:
+        logger.info("Using cached audio for canned response")
+        return _TTS_CACHE[cache_key]
+
+    # Convert to speech. text_to_speech translates internally when the
+    # target language is not English, so no separate translate call is
+    # needed here - that used to cost a second serial round trip and ran
+    # the already-translated text through the translator again
+    logger.info("Converting response to speech")
+    response_audio = await sarvam_service.text_to_speech(
+        text=english_text,
+        target_language=target_language
+    )
+    if not response_audio:
+        return None
+
+    mulaw_audio = await asyncio.to_thread(
+        audio_utils.convert_to_mulaw, _b64decode(response_audio)
+    )
+    if cacheable:
+        _TTS_CACHE[cache_key] = mulaw_audio
+    return mulaw_audio
+
+# Sentence boundaries for progressive TTS emission
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Phrases in an AI response that indicate it nudged the user towards an
+# appointment; compiled once so each turn is a single C-level scan
+_NUDGE_RE = re.compile(
+    r"booking link|professional therapist|connect with a professional|"
+    r"book an appointment|schedule a session",
+    re.IGNORECASE,
+)
+
+async def _speak_response(websocket: WebSocket, stream_sid: str,
+                          english_text: str, target_language: str) -> int:
+    """Speak a response sentence-by-sentence, pipelining TTS with playback.
+
+    The first sentence starts streaming as soon as it is synthesized while
+    the next sentence's TTS call runs concurrently, so time-to-first-audio
+    is bounded by one sentence instead of the whole response. Returns the
+    total number of mu-law bytes sent.
+    """
+    # Canned responses are rendered (and cached) whole
+    if english_text in _CANNED_RESPONSES:
+        sentences = [english_text]
+    else:
+        sentences = [s for s in _SENTENCE_SPLIT_RE.split(english_text) if s.strip()]
+
+    if len(sentences) <= 1:
+        mulaw_audio = await _render_speech(english_text, target_language)
+        if not mulaw_audio:
+            return 0
+        await _stream_mulaw(websocket, stream_sid, mulaw_audio)
+        return len(mulaw_audio)
+
+    total_bytes = 0
+    next_task = asyncio.create_task(_render_speech(sentences[0], target_language))
+    for index in range(len(sentences)):
+        mulaw_audio = await next_task
+        # Start synthesizing the next sentence before streaming this one
+        if index + 1 < len(sentences):
+            next_task = asyncio.create_task(
+                _render_speech(sentences[index + 1], target_language)
+            )
+        if mulaw_audio:
+            await _stream_mulaw(websocket, stream_sid, mulaw_audio)
+            total_bytes += len(mulaw_audio)
+    return total_bytes
 
-def should_process_speech(connection_id: str) -> bool:
+async def _speak_streamed_response(websocket: WebSocket, stream_sid: str,
+                                   sentences, target_language: str) -> tuple[int, str]:
+    """Speak an async stream of sentences, pipelining LLM, TTS and playback.
+
+    Like _speak_response, but consumes sentences as the LLM emits them, so
+    translation/TTS of the first sentence starts before the completion has
+    finished decoding. Returns (total mu-law bytes sent, full response text).
+    """
+    total_bytes = 0
+    spoken = []
+    render_task = None
+    async for sentence in sentences:
+        spoken.append(sentence)
+        next_task = asyncio.create_task(_render_speech(sentence, target_language))
+        if render_task is not None:
+            mulaw_audio = await render_task
+            if mulaw_audio:
+                await _stream_mulaw(websocket, stream_sid, mulaw_audio)
+                total_bytes += len(mulaw_audio)
+        render_task = next_task
+    if render_task is not None:
+        mulaw_audio = await render_task
+        if mulaw_audio:
+            await _stream_mulaw(websocket, stream_sid, mulaw_audio)
+            total_bytes += len(mulaw_audio)
+    return total_bytes, " ".join(spoken)
+
+async def _stream_mulaw(websocket: WebSocket, stream_sid: str, mulaw_audio: bytes):
+    """Send mu-law audio to Twilio as media frames.
+
+    Base64-encodes the whole buffer once and slices the encoded string,
+    wrapping each slice in a prebuilt JSON template instead of running
+    b64encode + json.dumps for every chunk.
+    """
+    await _stream_b64(websocket, stream_sid, _b64encode(mulaw_audio).decode('ascii'))
+
+async def _stream_b64(websocket: WebSocket, stream_sid: str, b64_audio: str):
+    """Send an already base64-encoded mu-law buffer as media frames"""
+    # Serialize the frame template once per utterance with orjson; base64
+    # payloads are JSON-safe ASCII so the placeholder can be spliced directly
+    template = orjson.dumps(
+        {"event": "media", "streamSid": stream_sid, "media": {"payload": "PAYLOAD"}}
+    ).decode('ascii')
+    frame_prefix, frame_suffix = template.split('PAYLOAD')
+    pos = 0
+    chunk_size = B64_FIRST_CHUNK_SIZE
+    chunk_index = 0
+    while pos < len(b64_audio):
+        await websocket.send_text(frame_prefix + b64_audio[pos:pos + chunk_size] + frame_suffix)
+        pos += chunk_size
+        # Progressive sizing: 20 -> 40 -> 80ms so playback starts on the
+        # first small chunk instead of waiting for a full-size frame
+        if chunk_size < B64_CHUNK_SIZE:
+            chunk_size = min(chunk_size * 2, B64_CHUNK_SIZE)
+        # Twilio buffers and paces playback itself, so no artificial delay is
+        # needed between frames; just yield periodically to keep the event
+        # loop responsive while long audio (e.g. breathing exercise) drains
+        chunk_index += 1
+        if chunk_index % 10 == 0:
+            await asyncio.sleep(0)
+
+def _now_ms() -> int:
+    """Current time in milliseconds from the monotonic clock (no syscall-backed
+    wall-clock read, immune to clock adjustments)"""
+    return time.monotonic_ns() // 1_000_000
+
+def should_process_speech(state: dict) -> bool:
     """Determine if we should process the current speech buffer"""
-    state = speech_states.get(connection_id, {})
     if not state:
         return False
     
-    current_time = time.time() * 1000
+    current_time = _now_ms()
     speech_start = state.get('speech_start', current_time)
     last_speech = state.get('last_speech', current_time)
     
@@ -58,39 +355,45 @@ def should_process_speech(connection_id: str) -> bool:
     # 2. OR we've reached maximum duration
     if speech_duration >= MIN_SPEECH_DURATION_MS:
         if silence_duration >= SILENCE_DURATION_MS or speech_duration >= MAX_SPEECH_DURATION_MS:
-            logger.info(f"Processing speech: duration={speech_duration}ms, silence={silence_duration}ms")
+            logger.info("Processing speech: duration=%dms, silence=%dms", speech_duration, silence_duration)
             return True
     
     return False
 
-async def process_audio(websocket: WebSocket, connection_id: str, media_data: dict):
+async def process_audio(websocket: WebSocket, connection_id: int, media_data: dict):
     """Process audio in background task"""
-    if processing_locks.get(connection_id, False):
+    conn = connections.get(connection_id)
+    if conn is None:
+        return
+    if conn.lock.locked():
+        # Keep the "already processing" skip: a trigger frame that arrives
+        # mid-processing is dropped, not queued
         logger.debug("Already processing audio for this connection")
         return
-        
+
+    await conn.lock.acquire()
     try:
-        processing_locks[connection_id] = True
-        buffer = audio_buffers[connection_id]
-        
+        buffer = conn.buffer
+
         if not buffer:
             return
-            
+
         duration_ms = audio_utils.get_audio_duration_ms(buffer)
         if duration_ms < MIN_SPEECH_DURATION_MS:
             return
-            
-        logger.info(f"Processing audio buffer of duration {duration_ms}ms")
-        
+
+        logger.info("Processing audio buffer of duration %sms", duration_ms)
+
         try:
-            # Convert to WAV
-            wav_data = audio_utils.convert_audio(buffer)
-            
+            # Convert to WAV off the event loop; snapshot the buffer first
+            # since the receive loop may still be extending it
+            wav_data = await asyncio.to_thread(audio_utils.convert_audio, bytes(buffer))
+
             # Removed file writing for latency improvement
-            
+
             # Clear buffer and reset speech state
-            audio_buffers[connection_id] = []
-            speech_states[connection_id] = {}
+            conn.buffer = bytearray()
+            conn.speech = {}
             
             # Process audio through Sarvam AI
             logger.info("Starting speech-to-text translation")
@@ -99,15 +402,15 @@ async def process_audio(websocket: WebSocket, connection_id: str, media_data: di
             )
             
             if english_text and len(english_text.strip()) > 0:
-                logger.info(f"Speech translated to English: '{english_text}', Original language: {original_language}")
+                logger.info("Speech translated to English: '%s', Original language: %s", english_text, original_language)
                 
                 # Default to English if language detection failed
                 if original_language is None:
                     original_language = "en-IN"
                 
                 # Initialize session data if not exists
-                if connection_id not in session_data:
-                    session_data[connection_id] = {
+                if not conn.session:
+                    conn.session = {
                         "phone": "Unknown",
                         "email": None,
                         "name": "Friend",
@@ -122,226 +425,192 @@ async def process_audio(websocket: WebSocket, connection_id: str, media_data: di
                 # Initialize flags
                 is_farewell = False
                 is_breathing_request = False
+                response_stream = None  # Set when the LLM response streams
                 
+                # Classify the utterance once; every intent branch below
+                # reads from this instead of re-scanning the text
+                intents = IntelligenceService.classify(english_text)
+
                 # ============ 1. CRISIS DETECTION ============
-                is_crisis = IntelligenceService.detect_crisis(english_text)
-                if is_crisis and not session_data[connection_id]["crisis_detected"]:
-                    logger.warning(f"🚨 CRISIS DETECTED: {english_text}")
-                    session_data[connection_id]["crisis_detected"] = True
-                    session_data[connection_id]["topics"].append(f"Crisis: {english_text[:50]}...")
+                is_crisis = intents["crisis"]
+                if is_crisis and not conn.session["crisis_detected"]:
+                    logger.warning("🚨 CRISIS DETECTED: %s", english_text)
+                    conn.session["crisis_detected"] = True
+                    conn.session["topics"].append(f"Crisis: {english_text[:50]}...")
                     
                     # Send emergency email
-                    phone = session_data[connection_id].get("phone", "Unknown")
-                    asyncio.create_task(asyncio.to_thread(
-                        email_service.send_crisis_alert, phone, english_text
-                    ))
+                    phone = conn.session.get("phone", "Unknown")
+                    _enqueue_email(email_service.send_crisis_alert, phone, english_text)
                     logger.info("Emergency email alert sent")
                     
                     # Compassionate crisis response
-                    english_response = "I hear you, and I want you to know that you matter. What you're feeling right now is temporary, even though it doesn't feel that way. Please, let's talk. If things feel too overwhelming, please reach out to iCALL at 9152987821 or Vandrevala Foundation at 1860-2662-345. I'm here with you right now."
+                    english_response = CRISIS_RESPONSE
                     logger.info("Crisis response generated")
                 
                 # ============ 2. MOOD DETECTION ============
                 elif not is_crisis:
-                    detected_mood = IntelligenceService.detect_mood(english_text)
+                    detected_mood = intents["mood"]
                     if detected_mood != "neutral":
-                        session_data[connection_id]["mood"] = detected_mood
-                        logger.info(f"Mood detected: {detected_mood}")
+                        conn.session["mood"] = detected_mood
+                        logger.info("Mood detected: %s", detected_mood)
                     
                     # Increment interaction count for nudge timing
-                    session_data[connection_id]["interaction_count"] = session_data[connection_id].get("interaction_count", 0) + 1
-                    interaction_count = session_data[connection_id]["interaction_count"]
-                    logger.info(f"Interaction count: {interaction_count}")
+                    conn.session["interaction_count"] = conn.session.get("interaction_count", 0) + 1
+                    interaction_count = conn.session["interaction_count"]
+                    logger.info("Interaction count: %d", interaction_count)
                     
                     # ============ 3. BREATHING EXERCISE REQUEST ============
-                    if IntelligenceService.detect_breathing_request(english_text):
+                    if intents["breathing"]:
                         is_breathing_request = True  # Flag for audio playback later
                         logger.info("Breathing exercise requested - will play audio after intro")
-                        english_response = "Of course, let's do a calming breathing exercise together. Get comfortable, close your eyes if you like, and follow along with this one-minute guided breathing."
-                        session_data[connection_id]["topics"].append("Breathing exercise")
+                        english_response = BREATHING_INTRO
+                        conn.session["topics"].append("Breathing exercise")
                     
                     # ============ 4. AWAITING EMAIL STATE - User was asked for email ============
-                    elif session_data[connection_id].get("awaiting_email", False):
-                        user_email = IntelligenceService.extract_email(english_text)
+                    elif conn.session.get("awaiting_email", False):
+                        user_email = intents["email"]
                         if user_email:
                             # Email provided - process booking
-                            session_data[connection_id]["email"] = user_email
-                            session_data[connection_id]["awaiting_email"] = False
-                            logger.info(f"User email collected (awaiting state): {user_email}")
+                            conn.session["email"] = user_email
+                            conn.session["awaiting_email"] = False
+                            logger.info("User email collected (awaiting state): %s", user_email)
                             
                             # Send booking link
-                            user_name = session_data[connection_id].get("name", "Friend")
-                            asyncio.create_task(asyncio.to_thread(
-                                email_service.send_appointment_booking_link, user_email, user_name
-                            ))
+                            user_name = conn.session.get("name", "Friend")
+                            _enqueue_email(email_service.send_appointment_booking_link, user_email, user_name)
                             
                             # Spell out email for confirmation
-                            spelled_email = " ".join(list(user_email.replace("@", " at ").replace(".", " dot ")))
+                            spelled_email = _spell_out_email(user_email)
                             english_response = f"Perfect! I've sent the appointment booking link to {spelled_email}. You'll receive it shortly. Our team will get back to you within 24 hours. Is there anything else you'd like to talk about?"
-                            session_data[connection_id]["topics"].append("Appointment booking completed")
+                            conn.session["topics"].append("Appointment booking completed")
                         else:
                             # No email detected - prompt again
                             logger.info("No email detected while awaiting - prompting again")
-                            english_response = "I didn't quite catch that email address. Could you please share your email address again? For example, yourname at gmail dot com."
+                            english_response = EMAIL_RETRY_PROMPT
                     
                     # ============ 5. NUDGED APPOINTMENT - Check for yes/no response ============
-                    elif session_data[connection_id].get("nudged_appointment", False):
-                        if IntelligenceService.detect_confirmation(english_text):
+                    elif conn.session.get("nudged_appointment", False):
+                        if intents["confirmation"]:
                             # User confirmed - ask for email
                             logger.info("User confirmed appointment suggestion")
-                            session_data[connection_id]["nudged_appointment"] = False
-                            session_data[connection_id]["awaiting_email"] = True
-                            english_response = "That's wonderful! Taking this step shows real strength. Could you please share your email address so I can send you the booking link?"
-                            session_data[connection_id]["topics"].append("Appointment interest confirmed")
-                        elif IntelligenceService.detect_decline(english_text):
+                            conn.session["nudged_appointment"] = False
+                            conn.session["awaiting_email"] = True
+                            english_response = APPOINTMENT_EMAIL_PROMPT
+                            conn.session["topics"].append("Appointment interest confirmed")
+                        elif intents["decline"]:
                             # User declined - continue normal conversation
                             logger.info("User declined appointment suggestion")
-                            session_data[connection_id]["nudged_appointment"] = False
-                            english_response = "That's completely okay. Remember, I'm always here whenever you need to talk. Is there anything else on your mind that you'd like to share?"
+                            conn.session["nudged_appointment"] = False
+                            english_response = APPOINTMENT_DECLINED_RESPONSE
                         else:
                             # Neither confirmation nor decline - pass to LLM
-                            session_data[connection_id]["nudged_appointment"] = False
+                            conn.session["nudged_appointment"] = False
                             logger.info("Unclear response to nudge - passing to LLM")
                             english_response = await sarvam_service.get_groq_response(english_text, connection_id)
                     
                     # ============ 6. APPOINTMENT BOOKING REQUEST (explicit) ============
-                    elif IntelligenceService.detect_booking_request(english_text):
+                    elif intents["booking"]:
                         logger.info("Appointment booking requested")
                         
-                        if session_data[connection_id].get("email"):
+                        if conn.session.get("email"):
                             # Already have email - send booking link
-                            user_email = session_data[connection_id]["email"]
-                            user_name = session_data[connection_id].get("name", "Friend")
-                            asyncio.create_task(asyncio.to_thread(
-                                email_service.send_appointment_booking_link, user_email, user_name
-                            ))
+                            user_email = conn.session["email"]
+                            user_name = conn.session.get("name", "Friend")
+                            _enqueue_email(email_service.send_appointment_booking_link, user_email, user_name)
                             english_response = f"That's a wonderful step towards your wellness journey. I've sent an appointment booking link to {user_email}. You can fill out the form, and our team will get back to you within 24 hours. Is there anything else you'd like to talk about?"
                         else:
                             # Need email - ask for it
-                            session_data[connection_id]["awaiting_email"] = True
-                            english_response = "I'd be happy to help you book an appointment with a professional therapist. Could you please share your email address so I can send you the booking link?"
-                        session_data[connection_id]["topics"].append("Appointment booking")
+                            conn.session["awaiting_email"] = True
+                            english_response = BOOKING_EMAIL_PROMPT
+                        conn.session["topics"].append("Appointment booking")
                     
                     # ============ 7. EMAIL COLLECTION (spontaneous - not awaiting) ============
                     elif "@" in english_text and "." in english_text:
-                        user_email = IntelligenceService.extract_email(english_text)
+                        user_email = intents["email"]
                         if user_email:
-                            session_data[connection_id]["email"] = user_email
-                            logger.info(f"User email collected (spontaneous): {user_email}")
+                            conn.session["email"] = user_email
+                            logger.info("User email collected (spontaneous): %s", user_email)
                             
                             # If we recently nudged or user seems to want appointment, send booking link
                             # Otherwise just acknowledge and confirm
-                            spelled_email = " ".join(list(user_email.replace("@", " at ").replace(".", " dot ")))
+                            spelled_email = _spell_out_email(user_email)
                             
                             # Send booking link since email was provided in appointment context
-                            user_name = session_data[connection_id].get("name", "Friend")
-                            asyncio.create_task(asyncio.to_thread(
-                                email_service.send_appointment_booking_link, user_email, user_name
-                            ))
+                            user_name = conn.session.get("name", "Friend")
+                            _enqueue_email(email_service.send_appointment_booking_link, user_email, user_name)
                             english_response = f"Thank you! I've noted your email as {spelled_email} and sent you the therapist booking link. Is there anything else you'd like to talk about?"
-                            session_data[connection_id]["topics"].append("Email collected - booking link sent")
+                            conn.session["topics"].append("Email collected - booking link sent")
                         else:
                             # Get response from Artika
                             logger.info("Getting response from Artika")
                             english_response = await sarvam_service.get_groq_response(english_text, connection_id)
-                            logger.info(f"Artika response: '{english_response}'")
+                            logger.info("Artika response: '%s'", english_response)
                     
                     # ============ 8. FAREWELL DETECTION ============
-                    elif IntelligenceService.detect_farewell(english_text):
+                    elif intents["farewell"]:
                         is_farewell = True
-                        english_response = "Thank you so much for sharing with me today. Remember, you're stronger than you know, and I'm always here whenever you need to talk. Take care of yourself, and don't hesitate to reach out anytime. Wishing you peace and wellness. Goodbye!"
+                        english_response = FAREWELL_RESPONSE
                         logger.info("Farewell detected - sending closing message")
                         
                         # Send session summary email if we have their email
-                        if session_data[connection_id].get("email"):
-                            user_email = session_data[connection_id]["email"]
-                            user_name = session_data[connection_id].get("name", "Friend")
-                            topics = session_data[connection_id].get("topics", [])
-                            mood = session_data[connection_id].get("mood", "neutral")
-                            asyncio.create_task(asyncio.to_thread(
-                                email_service.send_session_summary, user_email, user_name, topics, mood
-                            ))
-                            logger.info(f"Session summary email will be sent to {user_email}")
+                        if conn.session.get("email"):
+                            user_email = conn.session["email"]
+                            user_name = conn.session.get("name", "Friend")
+                            topics = conn.session.get("topics", [])
+                            mood = conn.session.get("mood", "neutral")
+                            _enqueue_email(email_service.send_session_summary, user_email, user_name, topics, mood)
+                            logger.info("Session summary email will be sent to %s", user_email)
                     
                     # ============ 9. NORMAL CONVERSATION ============
                     else:
                         is_farewell = False
                         # Track topic
                         if len(english_text) > 10:
-                            session_data[connection_id]["topics"].append(english_text[:50])
-                        
-                        # Get response from Artika (with conversation memory)
-                        logger.info("Getting response from Artika")
-                        english_response = await sarvam_service.get_groq_response(english_text, connection_id)
-                        logger.info(f"Artika response: '{english_response}'")
+                            conn.session["topics"].append(english_text[:50])
                         
-                        # Check if the AI response suggested an appointment
-                        # Mark as nudged if the response mentions booking/appointment/therapist
-                        appointment_nudge_indicators = ["booking link", "professional therapist", "connect with a professional", "book an appointment", "schedule a session"]
-                        if any(indicator in english_response.lower() for indicator in appointment_nudge_indicators):
-                            session_data[connection_id]["nudged_appointment"] = True
-                            logger.info("Appointment nudge detected in AI response - setting nudged_appointment flag")
+                        # Stream the response from Artika (with conversation
+                        # memory): sentences are synthesized and played as the
+                        # LLM produces them, so the completion's tail decodes
+                        # behind the audio already going out. The full text is
+                        # only known after playback, so the appointment-nudge
+                        # check happens at the send site below.
+                        logger.info("Getting streamed response from Artika")
+                        english_response = None
+                        response_stream = sarvam_service.stream_groq_response(english_text, connection_id)
                 
-                # Translate response if not English
-                if original_language != "en-IN":
-                    logger.info(f"Translating response to {original_language}")
-                    translated_response = await sarvam_service.translate_text(
-                        input_text=english_response,
-                        target_language=original_language,
-                        source_language="en-IN"
-                    )
-                    logger.info(f"Translated response: '{translated_response}'")
-                else:
-                    translated_response = english_response
-                
-                # Convert to speech
-                logger.info("Converting response to speech")
-                response_audio = await sarvam_service.text_to_speech(
-                    text=translated_response,
-                    target_language=original_language
-                )
-                
-                if response_audio and websocket in active_connections.values():
+                if connection_id in connections:
                     try:
-                        # Decode base64 audio
-                        wav_bytes = base64.b64decode(response_audio)
-                        
-                        # Removed response file writing for latency improvement
-                        
-                        # Convert to mu-law format for Twilio
-                        mu_law_audio = audio_utils.convert_to_mulaw(wav_bytes)
-                        
-                        # Removed mu-law file writing for latency improvement
-                        
-                        # Encode mu-law audio to base64 for Twilio
-                        response_payload = base64.b64encode(mu_law_audio).decode('utf-8')
-                        
-                        # Send audio response in chunks to avoid buffer overflow
-                        chunk_size = 640  # 20ms chunks at 8kHz
-                        for i in range(0, len(mu_law_audio), chunk_size):
-                            chunk = mu_law_audio[i:i + chunk_size]
-                            chunk_payload = base64.b64encode(chunk).decode('utf-8')
-                            
-                            # Send chunk to Twilio
-                            await websocket.send_text(json.dumps({
-                                "event": "media",
-                                "streamSid": media_data["streamSid"],
-                                "media": {
-                                    "payload": chunk_payload
-                                }
-                            }))
-                            
-                            # Small delay between chunks
-                            await asyncio.sleep(0.02)  # 20ms delay between chunks
-                            
+                        stream_sid = media_data["streamSid"]
+
+                        # Translate (if needed), synthesize and stream the
+                        # response sentence-by-sentence; canned responses come
+                        # back from the cache without any API calls
+                        if response_stream is not None:
+                            bytes_sent, english_response = await _speak_streamed_response(
+                                websocket, stream_sid, response_stream, original_language
+                            )
+                            logger.info("Artika response: '%s'", english_response)
+
+                            # Check if the AI response suggested an appointment
+                            # Mark as nudged if it mentions booking/appointment/therapist
+                            if _NUDGE_RE.search(english_response):
+                                conn.session["nudged_appointment"] = True
+                                logger.info("Appointment nudge detected in AI response - setting nudged_appointment flag")
+                        else:
+                            bytes_sent = await _speak_response(
+                                websocket, stream_sid, english_response, original_language
+                            )
+                        if not bytes_sent:
+                            logger.error("No response audio generated")
+                            return
                         logger.info("Audio response sent successfully in chunks")
                         
                         # If this was a farewell, close the call after audio finishes
                         if is_farewell:
                             # Calculate audio duration: mu-law is 8000 samples/sec, 1 byte per sample
-                            audio_duration_seconds = len(mu_law_audio) / 8000
+                            audio_duration_seconds = bytes_sent / 8000
                             wait_time = audio_duration_seconds + 2  # Add 2 seconds buffer
-                            logger.info(f"Farewell message sent ({audio_duration_seconds:.1f}s) - waiting {wait_time:.1f}s before ending call")
+                            logger.info("Farewell message sent (%.1fs) - waiting %.1fs before ending call", audio_duration_seconds, wait_time)
                             await asyncio.sleep(wait_time)
                             await websocket.close()
                             return  # Exit the process_audio function
@@ -349,43 +618,24 @@ async def process_audio(websocket: WebSocket, connection_id: str, media_data: di
                         # If breathing exercise was requested, play the breathing audio
                         if is_breathing_request:
                             logger.info("Playing breathing exercise audio...")
-                            breathing_audio = audio_utils.load_breathing_audio()
-                            if breathing_audio:
+                            breathing_b64 = await _get_breathing_b64()
+                            if breathing_b64:
+                                # Kick off follow-up TTS now so the network call
+                                # overlaps with streaming the breathing audio
+                                followup_task = asyncio.create_task(
+                                    _render_speech(BREATHING_FOLLOWUP, original_language)
+                                )
+
                                 # Send breathing audio in chunks
-                                chunk_size = 640
-                                for i in range(0, len(breathing_audio), chunk_size):
-                                    chunk = breathing_audio[i:i + chunk_size]
-                                    chunk_payload = base64.b64encode(chunk).decode('utf-8')
-                                    await websocket.send_text(json.dumps({
-                                        "event": "media",
-                                        "streamSid": media_data["streamSid"],
-                                        "media": {
-                                            "payload": chunk_payload
-                                        }
-                                    }))
-                                    await asyncio.sleep(0.02)
+                                await _stream_b64(websocket, stream_sid, breathing_b64)
                                 logger.info("Breathing audio sent successfully")
-                                
+
                                 # No need to wait - Twilio queues audio and plays sequentially
                                 # Send follow-up message immediately (it will play after breathing audio)
-                                followup_text = "Take a moment to notice how you feel now. Your body and mind have had a chance to reset. How are you feeling?"
                                 logger.info("Sending breathing follow-up message")
-                                followup_audio = await sarvam_service.text_to_speech(
-                                    text=followup_text,
-                                    target_language=original_language
-                                )
-                                if followup_audio:
-                                    followup_wav = base64.b64decode(followup_audio)
-                                    followup_mulaw = audio_utils.convert_to_mulaw(followup_wav)
-                                    for i in range(0, len(followup_mulaw), chunk_size):
-                                        chunk = followup_mulaw[i:i + chunk_size]
-                                        chunk_payload = base64.b64encode(chunk).decode('utf-8')
-                                        await websocket.send_text(json.dumps({
-                                            "event": "media",
-                                            "streamSid": media_data["streamSid"],
-                                            "media": {"payload": chunk_payload}
-                                        }))
-                                        await asyncio.sleep(0.02)
+                                followup_mulaw = await followup_task
+                                if followup_mulaw:
+                                    await _stream_mulaw(websocket, stream_sid, followup_mulaw)
                                     logger.info("Breathing follow-up sent")
                             else:
                                 logger.error("Could not load breathing audio file")
@@ -393,7 +643,7 @@ async def process_audio(websocket: WebSocket, connection_id: str, media_data: di
                     except Exception as e:
                         logger.error(f"Error handling response audio: {e}")
                 else:
-                    logger.error("No response audio generated or websocket disconnected")
+                    logger.error("Websocket disconnected before response could be sent")
             else:
                 logger.info("No speech detected in audio")
         
@@ -401,75 +651,179 @@ async def process_audio(websocket: WebSocket, connection_id: str, media_data: di
             logger.error(f"Error processing audio chunk: {str(e)}")
             # Don't clear buffer on error unless it's too long
             if duration_ms >= MAX_SPEECH_DURATION_MS:
-                audio_buffers[connection_id] = []
-                speech_states[connection_id] = {}
-    
+                conn.buffer = bytearray()
+                conn.speech = {}
+
     except Exception as e:
         logger.error(f"Error in process_audio: {e}")
-    
+
     finally:
-        processing_locks[connection_id] = False
+        conn.lock.release()
+
+# Idle-session sweeper: a Twilio stream that dies without a close frame
+# (NAT timeout, carrier drop) never reaches the handler's finally block, so
+# a background sweep evicts connections that stop producing media frames
+_SWEEP_INTERVAL_SECONDS = 60
+_sweeper_task: Optional[asyncio.Task] = None
+
+async def _sweeper():
+    while True:
+        await asyncio.sleep(_SWEEP_INTERVAL_SECONDS)
+        for connection_id, conn in list(connections.items()):
+            if not conn.ref_a and not conn.ref_b:
+                logger.warning("Evicting idle connection: %s", connection_id)
+                await _cleanup_connection(conn.websocket, connection_id)
+            elif conn.ref_a:
+                conn.ref_a = False
+            else:
+                conn.ref_b = False
+
+async def _cancel_and_wait(task: asyncio.Task, timeout: float = 2.0):
+    """Cancel a task and wait (bounded) for it to actually finish"""
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError, asyncio.TimeoutError):
+        await asyncio.wait_for(task, timeout=timeout)
+
+async def _cleanup_connection(websocket: WebSocket, connection_id: int):
+    """Tear down all per-call state for a connection.
+
+    Tasks are cancelled and then awaited (bounded) so their resources are
+    actually released before the entry disappears, instead of cancel() being
+    fired into the void.
+    """
+    # One pop drops buffer, speech state, session data and the lock together,
+    # so no key can be missed
+    conn = connections.pop(connection_id, None)
+    if conn is not None:
+        # Cancel-and-wait on both tasks concurrently: cleanup latency is the
+        # max of the waits, not their sum, and one failure can't skip the other
+        pending = [t for t in (conn.vad_task, conn.task) if t is not None and not t.done()]
+        if pending:
+            await asyncio.gather(
+                *(_cancel_and_wait(task) for task in pending),
+                return_exceptions=True,
+            )
+    # Clear conversation memory for this connection
+    sarvam_service.clear_conversation_history(connection_id)
+    logger.info("WebSocket connection closed and cleaned up: %s", connection_id)
+    # A half-open peer (carrier NAT drop) can stall the close handshake;
+    # give it a small budget instead of serializing cleanup behind it
+    with contextlib.suppress(asyncio.TimeoutError, RuntimeError):
+        await asyncio.wait_for(websocket.close(), timeout=2.0)
+
+async def _vad_worker(websocket: WebSocket, connection_id: int, conn: Connection):
+    """Consume media frames from the connection queue and run VAD.
+
+    Keeps silence detection and speech-state bookkeeping off the WebSocket
+    receive loop, so reception is never coupled to processing jitter.
+    """
+    while True:
+        media_data = await conn.queue.get()
+        # a2b_base64 skips b64decode's validation/altchars layers - worth it
+        # at 50 fixed-size frames per second per call
+        audio_data = binascii.a2b_base64(media_data["media"]["payload"])
+        if not conn.queue.empty():
+            # Drain whatever else is already queued: when the worker falls
+            # behind, the backlog is decoded and silence-checked as one
+            # batch (one vectorized pass) instead of one wakeup per frame
+            parts = [audio_data]
+            while not conn.queue.empty():
+                media_data = conn.queue.get_nowait()
+                parts.append(binascii.a2b_base64(media_data["media"]["payload"]))
+            audio_data = b"".join(parts)
+        current_time = _now_ms()
+
+        # Update speech state based on silence detection
+        is_silent = audio_utils.is_silence(audio_data)
+        state = conn.speech
+
+        if not is_silent:
+            # Speech detected
+            if not state:
+                # Start of new speech
+                state = {
+                    'speech_start': current_time,
+                    'last_speech': current_time
+                }
+            else:
+                # Continue speech
+                state['last_speech'] = current_time
+            conn.speech = state
+
+            # Add audio to buffer
+            buf = conn.buffer
+            buf.extend(audio_data)
+            if len(buf) > MAX_BUFFER_BYTES:
+                del buf[:len(buf) - MAX_BUFFER_BYTES]
+
+            # Check if we should process (max duration reached)
+            if should_process_speech(state):
+                conn.task = _spawn(process_audio(websocket, connection_id, media_data))
+        else:
+            # Silence detected
+            if state:
+                # Add silence to buffer
+                buf = conn.buffer
+                buf.extend(audio_data)
+                if len(buf) > MAX_BUFFER_BYTES:
+                    del buf[:len(buf) - MAX_BUFFER_BYTES]
+
+                # Check if we should process (enough silence after speech)
+                if should_process_speech(state):
+                    conn.task = _spawn(process_audio(websocket, connection_id, media_data))
 
 @router.websocket("/ws/media-stream")
 async def handle_media_stream(websocket: WebSocket):
     """Handle WebSocket connection for media streaming"""
-    connection_id = str(id(websocket))
-    logger.info(f"New WebSocket connection: {connection_id}")
+    # Plain int key: hashing 8 bytes beats hashing a stringified id on
+    # every per-frame dict operation
+    connection_id = id(websocket)
+    logger.info("New WebSocket connection: %s", connection_id)
     
     await websocket.accept()
-    logger.info(f"WebSocket connection accepted: {connection_id}")
-    
+    logger.info("WebSocket connection accepted: %s", connection_id)
+
+    # Second gate for streams that arrive despite the TwiML-level reject
+    # (e.g. a spike between webhook and stream start)
+    if len(connections) >= MAX_CONCURRENT_CALLS:
+        logger.warning("At capacity (%d calls) - closing media stream", len(connections))
+        with contextlib.suppress(RuntimeError):
+            await websocket.close()
+        return
+
+
     try:
         # Initialize connection state
-        active_connections[connection_id] = websocket
-        audio_buffers[connection_id] = []
-        processing_locks[connection_id] = False
-        speech_states[connection_id] = {}
-        
+        conn = Connection(websocket=websocket)
+        connections[connection_id] = conn
+
+        # Lazily start the idle sweeper once a connection exists
+        global _sweeper_task
+        if _sweeper_task is None or _sweeper_task.done():
+            _sweeper_task = asyncio.create_task(_sweeper())
+
+        # VAD and framing run in a dedicated worker so the receive loop
+        # only ever parses frames and enqueues them
+        conn.vad_task = _spawn(_vad_worker(websocket, connection_id, conn))
+
         while True:
-            # Receive audio data from Twilio
+            # Receive audio data from Twilio - orjson parses the small frame
+            # dicts a few times faster than stdlib json at 50 frames/sec
             data = await websocket.receive_text()
-            media_data = json.loads(data)
-            
-            if media_data.get("event") == "media":
-                # Process audio chunk
-                audio_data = base64.b64decode(media_data["media"]["payload"])
-                current_time = time.time() * 1000
-                
-                # Update speech state based on silence detection
-                is_silent = audio_utils.is_silence(audio_data)
-                state = speech_states.get(connection_id, {})
-                
-                if not is_silent:
-                    # Speech detected
-                    if not state:
-                        # Start of new speech
-                        state = {
-                            'speech_start': current_time,
-                            'last_speech': current_time
-                        }
-                    else:
-                        # Continue speech
-                        state['last_speech'] = current_time
-                    speech_states[connection_id] = state
-                    
-                    # Add audio to buffer
-                    audio_buffers[connection_id].append(audio_data)
-                    
-                    # Check if we should process (max duration reached)
-                    if should_process_speech(connection_id):
-                        await process_audio(websocket, connection_id, media_data)
-                else:
-                    # Silence detected
-                    if state:
-                        # Add silence to buffer
-                        audio_buffers[connection_id].append(audio_data)
-                        
-                        # Check if we should process (enough silence after speech)
-                        if should_process_speech(connection_id):
-                            await process_audio(websocket, connection_id, media_data)
-                
-            elif media_data.get("event") == "start":
+            media_data = orjson.loads(data)
+
+            # One event lookup per frame instead of one per branch
+            event = media_data.get("event")
+            if event == "media":
+                # Mark the connection live for the idle sweeper
+                conn.ref_a = conn.ref_b = True
+                # Hand the frame to the VAD worker; if the queue is full,
+                # drop the oldest frame rather than blocking the receive loop
+                if conn.queue.full():
+                    conn.queue.get_nowait()
+                conn.queue.put_nowait(media_data)
+
+            elif event == "start":
                 logger.info("Media stream started")
                 # Extract caller info from start event
                 start_data = media_data.get("start", {})
@@ -480,8 +834,8 @@ async def handle_media_stream(websocket: WebSocket):
                 stream_sid = start_data.get("streamSid", "")
                 
                 # Initialize session data with caller phone
-                if connection_id not in session_data:
-                    session_data[connection_id] = {
+                if not conn.session:
+                    conn.session = {
                         "phone": caller_phone,
                         "email": None,
                         "name": "Friend",
@@ -494,97 +848,128 @@ async def handle_media_stream(websocket: WebSocket):
                         "interaction_count": 0
                     }
                 else:
-                    session_data[connection_id]["phone"] = caller_phone
-                    session_data[connection_id]["stream_sid"] = stream_sid
+                    conn.session["phone"] = caller_phone
+                    conn.session["stream_sid"] = stream_sid
                 
-                logger.info(f"Caller phone captured: {caller_phone}")
-            elif media_data.get("event") == "stop":
+                logger.info("Caller phone captured: %s", caller_phone)
+            elif event == "stop":
                 logger.info("Media stream stopped")
                 # Process any remaining audio
-                if audio_buffers[connection_id]:
+                if conn.buffer:
                     await process_audio(websocket, connection_id, media_data)
-            elif media_data.get("event") == "mark":
-                logger.info(f"Received mark event: {media_data.get('type')}")
+            elif event == "mark":
+                logger.info("Received mark event: %s", media_data.get('type'))
     
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     
     finally:
-        # Clean up connection
-        if connection_id in active_connections:
-            del active_connections[connection_id]
-        if connection_id in audio_buffers:
-            del audio_buffers[connection_id]
-        if connection_id in processing_locks:
-            del processing_locks[connection_id]
-        if connection_id in speech_states:
-            del speech_states[connection_id]
-        if connection_id in background_tasks:
-            task = background_tasks[connection_id]
-            if not task.done():
-                task.cancel()
-            del background_tasks[connection_id]
-        # Clear conversation memory for this connection
-        sarvam_service.clear_conversation_history(connection_id)
-        # Clear session data
-        if connection_id in session_data:
-            del session_data[connection_id]
-        logger.info(f"WebSocket connection closed and cleaned up: {connection_id}")
-        try:
-            await websocket.close()
-        except:
-            pass
+        # Shield cleanup so a cancellation mid-teardown (e.g. hangup storm)
+        # cannot leave the connection entry or its tasks half-released
+        await asyncio.shield(_cleanup_connection(websocket, connection_id))
+
+# Webhook signature validation. The validator is built once at import so
+# each request only pays for the HMAC itself. Opt-in via env because it
+# requires the public URL Twilio signs to match what this app sees
+_VALIDATE_SIGNATURES = os.getenv("VALIDATE_TWILIO_SIGNATURE", "false").lower() in ("1", "true", "yes")
+_request_validator = RequestValidator(os.getenv("TWILIO_AUTH_TOKEN", ""))
+
+async def verify_twilio_signature(request: Request) -> None:
+    """FastAPI dependency validating X-Twilio-Signature on webhook posts"""
+    if not _VALIDATE_SIGNATURES:
+        return
+    signature = request.headers.get("X-Twilio-Signature", "")
+    raw_body = await request.body()
+    params = dict(urllib.parse.parse_qsl(raw_body.decode('ascii', 'replace')))
+    if not _request_validator.validate(str(request.url), params, signature):
+        logger.warning("Rejected webhook with invalid Twilio signature")
+        raise HTTPException(status_code=403, detail="Invalid Twilio signature")
+
+# TwiML for incoming calls varies only in the greeting verb, the host and
+# the caller number, so it is a prebuilt template instead of a VoiceResponse
+# object graph serialized per call. Values are XML-escaped on substitution
+_TWIML_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Response>{greeting}'
+    '<Connect><Stream url="wss://{host}/ws/media-stream">'
+    '<Parameter name="from" value="{from_number}" />'
+    '</Stream></Connect></Response>'
+)
+_TWIML_SAY_GREETING = f'<Say>{html.escape(GREETING_TEXT)}</Say>'
 
-@router.post("/voice")
-@router.post("/incoming-call")
+@router.post("/voice", dependencies=[Depends(verify_twilio_signature)])
+@router.post("/incoming-call", dependencies=[Depends(verify_twilio_signature)])
 async def handle_incoming_call(request: Request):
     """Handle incoming Twilio calls with TwiML response"""
     try:
         logger.info("Incoming call received")
-        form_data = await request.form()
-        
+        if len(connections) >= MAX_CONCURRENT_CALLS:
+            logger.warning("At capacity (%d calls) - rejecting incoming call", len(connections))
+            return Response(content=_BUSY_TWIML, media_type="application/xml")
+
+        # Twilio posts a flat urlencoded form with 30+ fields; parse_qsl on
+        # the raw body is much lighter than the full multipart-capable
+        # request.form() machinery for the two keys read here
+        raw_body = await request.body()
+        form_data = dict(urllib.parse.parse_qsl(raw_body.decode('ascii', 'replace')))
+
         # Get call information
         from_number = form_data.get('From', 'Unknown')
         from_city = form_data.get('FromCity', 'Unknown City')
-        logger.info(f"Call from {from_number} in {from_city}")
-        
-        # Create TwiML response
-        response = VoiceResponse()
-        
-        # Add initial greeting for MindBloom AI
-        response.say("Welcome to MindBloom AI. I'm Artika, your mental wellness companion. I'm here to listen and support you. Please feel free to share what's on your mind in any language.")
-        
-        # Use Connect with Stream for true bidirectional audio
-        # Connect verb allows both receiving and sending audio through WebSocket
-        connect = Connect()
-        stream = connect.stream(
-            url=f"wss://{request.headers.get('host')}/ws/media-stream"
+        logger.info("Call from %s in %s", from_number, from_city)
+
+        host = html.escape(request.headers.get('host', ''), quote=True)
+
+        # Greet with the pre-rendered clip once it exists (Twilio caches the
+        # <Play> URL); Twilio-side <Say> is only the first-call fallback
+        # while the render task warms the cache
+        global _greeting_render_task
+        if _greeting_audio is not None:
+            greeting = f'<Play>https://{host}/greeting.wav</Play>'
+        else:
+            greeting = _TWIML_SAY_GREETING
+            if _greeting_render_task is None or _greeting_render_task.done():
+                _greeting_render_task = asyncio.create_task(_render_greeting())
+
+        twiml = _TWIML_TEMPLATE.format(
+            greeting=greeting,
+            host=host,
+            from_number=html.escape(from_number, quote=True),
         )
-        # Pass caller phone number as custom parameter
-        stream.parameter(name="from", value=from_number)
-        response.append(connect)
-        
+
         logger.info("Generated TwiML response")
-        logger.debug(f"TwiML: {str(response)}")
-        
+        logger.debug("TwiML: %s", twiml)
+
         # Return TwiML response
-        return Response(content=str(response), media_type="application/xml")
-    
+        return Response(content=twiml, media_type="application/xml")
+
     except Exception as e:
         logger.error(f"Error handling incoming call: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/greeting.wav")
+async def serve_greeting():
+    """Serve the pre-rendered greeting clip for Twilio <Play> (cacheable)"""
+    audio = await _render_greeting()
+    if audio is None:
+        raise HTTPException(status_code=503, detail="Greeting audio not available")
+    return Response(
+        content=audio,
+        media_type="audio/wav",
+        headers={"Cache-Control": "public, max-age=86400"},
+    )
+
 @router.post("/outbound-call")
 async def create_outbound_call(call_data: dict):
     """Create an outbound call"""
     try:
-        logger.info(f"Creating outbound call: {call_data}")
+        logger.info("Creating outbound call: %s", call_data)
         call = twilio_service.create_call(
             to_number=call_data["to"],
             webhook_url=call_data["webhook_url"],
             from_number=call_data.get("from")  # Optional from_number
         )
-        logger.info(f"Outbound call created successfully: {call.sid}")
+        logger.info("Outbound call created successfully: %s", call.sid)
         return {"call_sid": call.sid}
     except Exception as e:
         logger.error(f"Error creating outbound call: {e}")
@@ -1,9 +1,45 @@
 import re
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - compiled alternations remain the fallback
+    ahocorasick = None
+
+
+def _build_automaton(category_phrases) -> "ahocorasick.Automaton":
+    """Build one Aho-Corasick automaton over every keyword list.
+
+    Each phrase maps to the frozenset of categories it triggers (a phrase
+    like "fine" appears in more than one list). One automaton pass then
+    finds every category hit in a single linear scan of the text, with the
+    same substring semantics as the old per-keyword `in` checks.
+    """
+    phrase_cats: Dict[str, set] = {}
+    for category, phrases in category_phrases:
+        for phrase in phrases:
+            phrase_cats.setdefault(phrase, set()).add(category)
+    automaton = ahocorasick.Automaton()
+    for phrase, cats in phrase_cats.items():
+        automaton.add_word(phrase, frozenset(cats))
+    automaton.make_automaton()
+    return automaton
+
+
+def _compile_keywords(keywords) -> re.Pattern:
+    """Compile a keyword list into one alternation pattern.
+
+    Keywords are escaped and sorted longest-first so the compiled scan
+    matches exactly the same substrings the old per-keyword `in` checks did.
+    """
+    parts = sorted(keywords, key=len, reverse=True)
+    return re.compile("|".join(re.escape(kw) for kw in parts))
+
+
 class IntelligenceService:
     # Crisis detection keywords - COMPREHENSIVE LIST
-    CRISIS_KEYWORDS = [
+    CRISIS_KEYWORDS = (
         # Suicide-related
         "kill myself", "killing myself", "suicide", "suicidal", "suicidal thoughts",
         "want to die", "wanna die", "wanting to die", "wish i was dead", "wish i were dead",
@@ -44,112 +80,203 @@ class IntelligenceService:
 
         # Single dangerous words (check carefully)
         "khatam", "marna chahta", "marna chahti", "jaan dena", "zindagi khatam"
-    ]
+    )
 
     # Mood detection keywords (does NOT include crisis words - those are checked first)
     MOOD_KEYWORDS = {
-        "anxious": ["anxious", "worried", "nervous", "panic", "stressed", "anxiety", "fear", "scared"],
-        "sad": ["sad", "depressed", "lonely", "crying", "unhappy", "miserable", "grief", "down", "low"],
-        "angry": ["angry", "frustrated", "irritated", "rage", "mad", "annoyed", "furious"],
-        "happy": ["happy", "good", "great", "wonderful", "excited", "joyful", "grateful", "blessed"],
-        "calm": ["calm", "peaceful", "relaxed", "content", "okay", "fine", "better"]
+        "anxious": ("anxious", "worried", "nervous", "panic", "stressed", "anxiety", "fear", "scared"),
+        "sad": ("sad", "depressed", "lonely", "crying", "unhappy", "miserable", "grief", "down", "low"),
+        "angry": ("angry", "frustrated", "irritated", "rage", "mad", "annoyed", "furious"),
+        "happy": ("happy", "good", "great", "wonderful", "excited", "joyful", "grateful", "blessed"),
+        "calm": ("calm", "peaceful", "relaxed", "content", "okay", "fine", "better")
     }
 
     # Breathing exercise trigger phrases
-    BREATHING_TRIGGERS = [
+    BREATHING_TRIGGERS = (
         "breathing exercise", "help me breathe", "calm me down", "breathing",
         "can't breathe", "panic attack", "help me relax", "meditation",
         "guided breathing", "deep breath"
-    ]
+    )
 
     # Appointment booking trigger phrases
-    BOOKING_TRIGGERS = [
+    BOOKING_TRIGGERS = (
         "book appointment", "schedule therapy", "talk to therapist",
         "professional help", "see a counselor", "book session", "therapy appointment",
         "speak to someone", "real person", "human therapist"
-    ]
+    )
 
-    FAREWELL_PHRASES = [
+    FAREWELL_PHRASES = (
         "bye", "goodbye", "good bye", "see you", "take care",
         "that's all", "thats all", "i'm done", "im done", "thank you bye",
         "thanks bye", "end call", "hang up", "gotta go", "need to go",
         "talk later", "bye bye", "tata", "alvida", "dhanyavaad", "shukriya"
-    ]
+    )
     
     # Confirmation phrases (for accepting appointment suggestions)
-    CONFIRMATION_PHRASES = [
+    CONFIRMATION_PHRASES = (
         "yes", "ok", "okay", "sure", "yeah", "yep", "yup", "yes please",
         "go ahead", "sounds good", "please", "i'd like that", "i would like that",
         "let's do it", "lets do it", "that would be great", "that would be nice",
         "i'm interested", "im interested", "book it", "definitely", "absolutely",
         "of course", "why not", "alright", "fine", "i agree", "i want that",
         "send it", "send me", "yes send", "please send"
-    ]
+    )
     
     # Decline phrases (for declining appointment suggestions)
-    DECLINE_PHRASES = [
+    DECLINE_PHRASES = (
         "no", "not now", "maybe later", "no thanks", "no thank you", "nope",
         "not interested", "skip", "not yet", "i'm good", "im good", "i'm fine",
         "im fine", "no need", "don't want", "dont want", "not right now",
         "another time", "some other time", "pass", "not today", "i'll think about it",
         "ill think about it", "let me think", "i'm not sure", "im not sure"
-    ]
+    )
+
+    # Precompiled alternation patterns - each keyword list becomes a single
+    # compiled scan instead of one `in` pass per keyword
+    _CRISIS_RE = _compile_keywords(CRISIS_KEYWORDS)
+    _MOOD_RES = {mood: _compile_keywords(kws) for mood, kws in MOOD_KEYWORDS.items()}
+    _BREATHING_RE = _compile_keywords(BREATHING_TRIGGERS)
+    _BOOKING_RE = _compile_keywords(BOOKING_TRIGGERS)
+    _FAREWELL_RE = _compile_keywords(FAREWELL_PHRASES)
+    _CONFIRMATION_RE = _compile_keywords(CONFIRMATION_PHRASES)
+    _DECLINE_RE = _compile_keywords(DECLINE_PHRASES)
+
+    _EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+    # Short exact matches for confirmation/decline as frozensets: one hash
+    # probe handles trivial utterances like "yes" or "no." before any
+    # pattern search runs
+    _CONFIRM_EXACT = frozenset(
+        ("yes", "ok", "okay", "sure", "yeah", "yep", "yup", "please", "alright", "fine")
+    )
+    _DECLINE_EXACT = frozenset(("no", "nope", "nah", "pass", "skip"))
+
+    # One automaton over all scan-style categories (confirmation/decline are
+    # excluded: they carry exact-match-after-strip semantics of their own)
+    _AC = (
+        _build_automaton(
+            (
+                ("crisis", CRISIS_KEYWORDS),
+                ("breathing", BREATHING_TRIGGERS),
+                ("booking", BOOKING_TRIGGERS),
+                ("farewell", FAREWELL_PHRASES),
+            )
+            + tuple(("mood:" + mood, kws) for mood, kws in MOOD_KEYWORDS.items())
+        )
+        if ahocorasick is not None
+        else None
+    )
+
+    _INTENT_KEYS = ("crisis", "mood", "breathing", "booking", "farewell",
+                    "confirmation", "decline", "email")
 
     @classmethod
-    def detect_crisis(cls, text: str) -> bool:
+    def classify(cls, text: str) -> dict:
+        """Classify an utterance against every intent category in one call.
+
+        With pyahocorasick available, crisis/mood/breathing/booking/farewell
+        come from a single linear automaton pass; otherwise each category's
+        compiled alternation pattern runs over the lowered text. Results are
+        memoized on the exact transcript, so a repeated or echoed utterance
+        (common with interim transcripts) costs one cache hit.
+        """
+        return dict(zip(cls._INTENT_KEYS, cls._classify(text)))
+
+    @classmethod
+    @lru_cache(maxsize=2048)
+    def _classify(cls, text: str) -> tuple:
+        """Uncached single-pass classification, returned as a tuple in
+        _INTENT_KEYS order so the memoized value is immutable"""
         text_lower = text.lower()
-        return any(keyword in text_lower for keyword in cls.CRISIS_KEYWORDS)
+        if cls._AC is not None:
+            hits = set()
+            for _, cats in cls._AC.iter(text_lower):
+                hits.update(cats)
+            mood = "neutral"
+            for candidate in cls.MOOD_KEYWORDS:
+                if ("mood:" + candidate) in hits:
+                    mood = candidate
+                    break
+            return (
+                "crisis" in hits,
+                mood,
+                "breathing" in hits,
+                "booking" in hits,
+                "farewell" in hits,
+                cls.detect_confirmation(text),
+                cls.detect_decline(text),
+                cls.extract_email(text),
+            )
+
+        mood = "neutral"
+        for candidate, pattern in cls._MOOD_RES.items():
+            if pattern.search(text_lower):
+                mood = candidate
+                break
+        return (
+            cls._CRISIS_RE.search(text_lower) is not None,
+            mood,
+            cls._BREATHING_RE.search(text_lower) is not None,
+            cls._BOOKING_RE.search(text_lower) is not None,
+            cls._FAREWELL_RE.search(text_lower) is not None,
+            cls.detect_confirmation(text),
+            cls.detect_decline(text),
+            cls.extract_email(text),
+        )
+
+    @classmethod
+    def detect_crisis(cls, text: str) -> bool:
+        return cls._CRISIS_RE.search(text.lower()) is not None
 
     @classmethod
     def detect_mood(cls, text: str) -> str:
         text_lower = text.lower()
-        for mood, keywords in cls.MOOD_KEYWORDS.items():
-            if any(kw in text_lower for kw in keywords):
+        for mood, pattern in cls._MOOD_RES.items():
+            if pattern.search(text_lower):
                 return mood
         return "neutral"
 
     @classmethod
     def detect_breathing_request(cls, text: str) -> bool:
-        text_lower = text.lower()
-        return any(trigger in text_lower for trigger in cls.BREATHING_TRIGGERS)
+        return cls._BREATHING_RE.search(text.lower()) is not None
 
     @classmethod
     def detect_booking_request(cls, text: str) -> bool:
-        text_lower = text.lower()
-        return any(trigger in text_lower for trigger in cls.BOOKING_TRIGGERS)
+        return cls._BOOKING_RE.search(text.lower()) is not None
 
     @classmethod
     def detect_farewell(cls, text: str) -> bool:
-        text_lower = text.lower()
-        return any(phrase in text_lower for phrase in cls.FAREWELL_PHRASES)
+        return cls._FAREWELL_RE.search(text.lower()) is not None
 
     @classmethod
     def extract_email(cls, text: str) -> Optional[str]:
-        if "@" in text and "." in text:
-            # Try to extract email from text
-            email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-            email_match = re.search(email_pattern, text)
-            if email_match:
-                return email_match.group()
+        at = text.find("@")
+        if at < 0:
+            return None
+        # Anchor the scan near the '@': local parts are at most 64 chars,
+        # so a long transcript's prefix never needs to be walked
+        email_match = cls._EMAIL_RE.search(text, max(0, at - 64))
+        if email_match:
+            return email_match.group()
         return None
     
     @classmethod
     def detect_confirmation(cls, text: str) -> bool:
         """Detect if user is confirming/agreeing (e.g., to an appointment suggestion)"""
         text_lower = text.lower().strip()
-        # Check for exact matches for short phrases
-        if text_lower in ["yes", "ok", "okay", "sure", "yeah", "yep", "yup", "please", "alright", "fine"]:
+        # Check for exact matches for short phrases (punctuation-tolerant)
+        if text_lower.strip(".!?, ") in cls._CONFIRM_EXACT:
             return True
         # Check for phrase matches
-        return any(phrase in text_lower for phrase in cls.CONFIRMATION_PHRASES)
+        return cls._CONFIRMATION_RE.search(text_lower) is not None
     
     @classmethod
     def detect_decline(cls, text: str) -> bool:
         """Detect if user is declining (e.g., an appointment suggestion)"""
         text_lower = text.lower().strip()
-        # Check for exact matches for short phrases
-        if text_lower in ["no", "nope", "nah", "pass", "skip"]:
+        # Check for exact matches for short phrases (punctuation-tolerant)
+        if text_lower.strip(".!?, ") in cls._DECLINE_EXACT:
             return True
         # Check for phrase matches
-        return any(phrase in text_lower for phrase in cls.DECLINE_PHRASES)
+        return cls._DECLINE_RE.search(text_lower) is not None
 
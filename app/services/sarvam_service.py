@@ -1,51 +1,79 @@
 import os
-import base64
-import json
 import logging
+import re
+import orjson
 import httpx
-import tempfile
-from groq import Groq
-from typing import Tuple, Optional, Dict
+from collections import OrderedDict, deque
+from groq import AsyncGroq
+from typing import AsyncIterator, Tuple, Optional, Deque, Dict
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging is configured once in call_handler (LOG_LEVEL env var); a
+# module-level basicConfig(DEBUG) here forced every logger to DEBUG
 logger = logging.getLogger(__name__)
 
 class SarvamAIService:
     def __init__(self):
         self.api_key = os.getenv("SARVAM_API_KEY")
         self.base_url = "https://api.sarvam.ai"
-        self.groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        
+        self.groq_client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+
+        # One shared client for all Sarvam calls: keep-alive connections
+        # avoid a fresh DNS resolution + TLS handshake per request
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=100),
+            timeout=10.0
+        )
+
+        # Shared header dicts, built once instead of per request
+        self._auth_headers = {'api-subscription-key': self.api_key}
+        self._json_headers = {
+            "Content-Type": "application/json",
+            "api-subscription-key": self.api_key
+        }
+
+        # Request payload templates: per call only the varying fields are
+        # written into a copy()
+        self._translate_tpl = {
+            "model": "mayura:v1",
+            "enable_preprocessing": True
+        }
+        self._tts_tpl = {
+            "model": "bulbul:v2",
+            # Ask for 8kHz directly so the mu-law conversion for Twilio
+            # doesn't have to resample the whole clip
+            "speech_sample_rate": 8000
+        }
+
         if not self.api_key:
             raise ValueError("SARVAM_API_KEY environment variable not set")
-        
+
         if not os.getenv("GROQ_API_KEY"):
             raise ValueError("GROQ_API_KEY environment variable not set")
+
+    async def prewarm(self):
+        """Open a connection to the API host so the first real call doesn't
+        pay DNS + TLS setup"""
+        try:
+            await self.http_client.get(self.base_url, timeout=5.0)
+        except Exception as e:
+            logger.warning(f"Sarvam client prewarm failed: {e}")
+
+    async def aclose(self):
+        """Close the shared HTTP client (called from app shutdown)"""
+        await self.http_client.aclose()
     
     async def transcribe_and_translate_audio(self, audio_data: bytes, prompt: str = None) -> Tuple[Optional[str], Optional[str]]:
         """
         Transcribe audio and translate to English if needed.
         Returns (transcript, language_code)
         """
-        temp_file_path = None
-        file_handle = None
-        
         try:
-            # Create temporary file to store audio data
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
-            
-            # Open file and prepare for upload
-            file_handle = open(temp_file_path, 'rb')
+            # Upload straight from memory - httpx accepts bytes in multipart
+            # fields, so there's no need to round-trip through a temp file
             files = {
-                'file': ('audio.wav', file_handle, 'audio/wav')
+                'file': ('audio.wav', audio_data, 'audio/wav')
             }
-            
+
             data = {
                 'model': 'saaras:v2.5'
             }
@@ -53,55 +81,37 @@ class SarvamAIService:
             if prompt:
                 data['prompt'] = prompt
             
-            headers = {
-                'api-subscription-key': self.api_key
-            }
-            
             # Make API request
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/speech-to-text-translate",
-                    files=files,
-                    data=data,
-                    headers=headers,
-                    timeout=30.0
-                )
-                
-                # Log the full response for debugging
-                logger.debug(f"Sarvam API Response Status: {response.status_code}")
-                logger.debug(f"Sarvam API Response Body: {response.text}")
+            response = await self.http_client.post(
+                f"{self.base_url}/speech-to-text-translate",
+                files=files,
+                data=data,
+                headers=self._auth_headers,
+                timeout=30.0
+            )
+            
+            # Log the full response for debugging
+            logger.debug(f"Sarvam API Response Status: {response.status_code}")
+            logger.debug(f"Sarvam API Response Body: {response.text}")
+            
+            if response.status_code == 200:
+                result = orjson.loads(response.content)
+                transcript = result.get("transcript", "")
+                language_code = result.get("language_code", "en-IN")
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    transcript = result.get("transcript", "")
-                    language_code = result.get("language_code", "en-IN")
-                    
-                    # Return empty if no speech detected
-                    if not transcript:
-                        logger.info("No speech detected in audio")
-                        return None, None
-                        
-                    return transcript.strip(), language_code
-                else:
-                    logger.error(f"Sarvam AI API error: {response.status_code} - {response.text}")
+                # Return empty if no speech detected
+                if not transcript:
+                    logger.info("No speech detected in audio")
                     return None, None
                     
+                return transcript.strip(), language_code
+            else:
+                logger.error(f"Sarvam AI API error: {response.status_code} - {response.text}")
+                return None, None
+                
         except Exception as e:
             logger.error(f"Error in transcribe_and_translate_audio: {str(e)}")
             return None, None
-        finally:
-            # Properly close file handle first
-            if file_handle:
-                try:
-                    file_handle.close()
-                except:
-                    pass
-            # Then delete the temp file
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                except Exception as e:
-                    logger.warning(f"Could not delete temp file: {e}")
     
     async def translate_text(
         self,
@@ -113,39 +123,30 @@ class SarvamAIService:
     ) -> Optional[str]:
         """Translate text using Sarvam AI"""
         try:
-            payload = {
-                "input": input_text,
-                "source_language_code": source_language,
-                "target_language_code": target_language,
-                "speaker_gender": speaker_gender,
-                "mode": mode,
-                "model": "mayura:v1",
-                "enable_preprocessing": True
-            }
-            
-            headers = {
-                "Content-Type": "application/json",
-                "api-subscription-key": self.api_key
-            }
+            payload = self._translate_tpl.copy()
+            payload["input"] = input_text
+            payload["source_language_code"] = source_language
+            payload["target_language_code"] = target_language
+            payload["speaker_gender"] = speaker_gender
+            payload["mode"] = mode
+
+            response = await self.http_client.post(
+                f"{self.base_url}/translate",
+                content=orjson.dumps(payload),
+                headers=self._json_headers,
+                timeout=10.0
+            )
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/translate",
-                    json=payload,
-                    headers=headers,
-                    timeout=10.0
-                )
+            if response.status_code == 200:
+                result = orjson.loads(response.content)
+                translated_text = result.get("translated_text")
+                if translated_text:
+                    return translated_text.strip()
+                return input_text
+            else:
+                logger.error(f"Translation error: {response.status_code} - {response.text}")
+                return input_text
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    translated_text = result.get("translated_text")
-                    if translated_text:
-                        return translated_text.strip()
-                    return input_text
-                else:
-                    logger.error(f"Translation error: {response.status_code} - {response.text}")
-                    return input_text
-                    
         except Exception as e:
             logger.error(f"Error in translate_text: {str(e)}")
             return input_text
@@ -173,55 +174,50 @@ class SarvamAIService:
             
             logger.info(f"Sending TTS request for text: '{text}' in language: {target_language}")
             
-            payload = {
-                "inputs": [text],
-                "target_language_code": target_language,
-                "speaker": speaker,
-                "model": "bulbul:v2"
-            }
-            
-            headers = {
-                "Content-Type": "application/json",
-                "api-subscription-key": self.api_key
-            }
+            payload = self._tts_tpl.copy()
+            payload["inputs"] = [text]
+            payload["target_language_code"] = target_language
+            payload["speaker"] = speaker
+
+            response = await self.http_client.post(
+                f"{self.base_url}/text-to-speech",
+                content=orjson.dumps(payload),
+                headers=self._json_headers,
+                timeout=10.0
+            )
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/text-to-speech",
-                    json=payload,
-                    headers=headers,
-                    timeout=10.0
-                )
+            if response.status_code == 200:
+                result = orjson.loads(response.content)
+                if result.get("audios"):
+                    # Return the base64 string as-is: decoding it here just
+                    # to prove it decodes threw away a full O(N) pass per
+                    # response. The caller decodes exactly once.
+                    audio_base64 = result["audios"][0]
+                    logger.info("Successfully generated audio of ~%d bytes", len(audio_base64) * 3 // 4)
+                    return audio_base64
+                logger.error("No audio in response")
+                return None
+            else:
+                logger.error(f"TTS error: {response.status_code} - {response.text}")
+                return None
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("audios"):
-                        # Get base64 audio and verify it's valid
-                        audio_base64 = result["audios"][0]
-                        try:
-                            # Verify base64 can be decoded
-                            audio_bytes = base64.b64decode(audio_base64)
-                            logger.info(f"Successfully generated audio of size: {len(audio_bytes)} bytes")
-                            return audio_base64
-                        except Exception as e:
-                            logger.error(f"Invalid base64 audio data: {e}")
-                            return None
-                    logger.error("No audio in response")
-                    return None
-                else:
-                    logger.error(f"TTS error: {response.status_code} - {response.text}")
-                    return None
-                    
         except Exception as e:
             logger.error(f"Error in text_to_speech: {str(e)}")
             return None
     
-    # Conversation memory for each call session
-    conversation_histories: Dict[str, list] = {}
+    # Conversation memory for each call session. Bounded deques trim the
+    # oldest exchange in O(1) on append instead of re-slicing the list
+    # every turn (10 exchanges = 20 messages).
+    # The dict itself is LRU-bounded: cleanup normally removes entries on
+    # disconnect, but a crashed connection would otherwise leak its history
+    # forever on a long-running server.
+    conversation_histories: "OrderedDict[int, Deque[dict]]" = OrderedDict()
+    _MAX_SESSIONS = 10_000
     
-    def get_system_prompt(self) -> str:
-        """Get the system prompt for Artika - Mental Health AI"""
-        return """You are Artika, a warm, empathetic, and compassionate mental health support companion from MindBloom AI. 
+    # System prompt for Artika - Mental Health AI. Built once as the exact
+    # message dict the chat API takes, so each request reuses it by
+    # reference instead of re-wrapping the ~1.5KB literal.
+    _SYSTEM_MSG = {"role": "system", "content": """You are Artika, a warm, empathetic, and compassionate mental health support companion from MindBloom AI.
 
 🌸 YOUR PERSONALITY:
 - You speak with genuine warmth and care, like a trusted friend who truly understands
@@ -263,32 +259,102 @@ class SarvamAIService:
 - Never diagnose conditions or prescribe treatments
 - If someone is in immediate danger, encourage them to contact emergency services
 
-Remember: Every conversation is a chance to make someone feel heard, valued, and a little less alone. You are their gentle guide on their mental wellness journey."""
+Remember: Every conversation is a chance to make someone feel heard, valued, and a little less alone. You are their gentle guide on their mental wellness journey."""}
+
+    def get_system_prompt(self) -> str:
+        """Get the system prompt for Artika - Mental Health AI"""
+        return self._SYSTEM_MSG["content"]
+
+    # Sentence boundary for the streaming path: split after ./!/? followed
+    # by whitespace, so each yielded piece is speakable on its own
+    _SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+
+    # Canned fallback when the LLM call fails
+    _FALLBACK_RESPONSE = "I'm here for you. Could you tell me a bit more about what's on your mind? I want to make sure I understand."
+
+    def _history_for(self, connection_id: int) -> Deque[dict]:
+        """Return this connection's history, creating it if needed and
+        evicting the least-recently-used session past the cap"""
+        history = self.conversation_histories.get(connection_id)
+        if history is None:
+            history = self.conversation_histories[connection_id] = deque(maxlen=20)
+            if len(self.conversation_histories) > self._MAX_SESSIONS:
+                self.conversation_histories.popitem(last=False)
+        else:
+            self.conversation_histories.move_to_end(connection_id)
+        return history
+
+    async def stream_groq_response(self, user_message: str, connection_id: int = 0) -> AsyncIterator[str]:
+        """Stream the Groq response, yielding one complete sentence at a time.
 
-    async def get_groq_response(self, user_message: str, connection_id: str = "default") -> str:
+        TTS only needs the first sentence to start synthesis, so yielding
+        sentences as the LLM decodes them lets speech generation overlap
+        with the rest of the completion instead of waiting for all ~200
+        tokens. Conversation memory is updated with the full response once
+        the stream ends.
+        """
+        history = self._history_for(connection_id)
+        history.append({
+            "role": "user",
+            "content": user_message
+        })
+        sentences_out = []
+        try:
+            stream = await self.groq_client.chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                messages=[self._SYSTEM_MSG, *history],
+                max_tokens=200,
+                temperature=0.75,
+                stream=True
+            )
+            pending = ""
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                pending += delta
+                while (boundary := self._SENTENCE_END_RE.search(pending)) is not None:
+                    sentence = pending[:boundary.start()].strip()
+                    pending = pending[boundary.end():]
+                    if sentence:
+                        sentences_out.append(sentence)
+                        yield sentence
+            tail = pending.strip()
+            if tail:
+                sentences_out.append(tail)
+                yield tail
+        except Exception as e:
+            logger.error(f"Error streaming Groq response: {str(e)}")
+            if not sentences_out:
+                sentences_out.append(self._FALLBACK_RESPONSE)
+                yield self._FALLBACK_RESPONSE
+
+        response = " ".join(sentences_out)
+        history.append({
+            "role": "assistant",
+            "content": response
+        })
+        logger.info(f"Artika response for {connection_id}: {response}")
+
+    async def get_groq_response(self, user_message: str, connection_id: int = 0) -> str:
         """Get response from Groq (Llama 3.3 70B) with conversation memory"""
         try:
-            # Initialize conversation history for new connections
-            if connection_id not in self.conversation_histories:
-                self.conversation_histories[connection_id] = []
-            
-            # Add user message to history
-            self.conversation_histories[connection_id].append({
+            history = self._history_for(connection_id)
+
+            # Add user message to history (the deque drops the oldest
+            # message itself once 10 exchanges are held)
+            history.append({
                 "role": "user",
                 "content": user_message
             })
-            
-            # Keep only last 10 exchanges to manage context length
-            if len(self.conversation_histories[connection_id]) > 20:
-                self.conversation_histories[connection_id] = self.conversation_histories[connection_id][-20:]
-            
+
             # Build messages with system prompt + conversation history
-            messages = [
-                {"role": "system", "content": self.get_system_prompt()}
-            ] + self.conversation_histories[connection_id]
-            
+            messages = [self._SYSTEM_MSG, *history]
+
             # Get completion from Groq
-            completion = self.groq_client.chat.completions.create(
+            completion = await self.groq_client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=messages,
                 max_tokens=200,
@@ -299,7 +365,7 @@ Remember: Every conversation is a chance to make someone feel heard, valued, and
             response = completion.choices[0].message.content.strip()
             
             # Add assistant response to history
-            self.conversation_histories[connection_id].append({
+            history.append({
                 "role": "assistant",
                 "content": response
             })
@@ -311,7 +377,7 @@ Remember: Every conversation is a chance to make someone feel heard, valued, and
             logger.error(f"Error getting Groq response: {str(e)}")
             return "I'm here for you. Could you tell me a bit more about what's on your mind? I want to make sure I understand."
     
-    def clear_conversation_history(self, connection_id: str):
+    def clear_conversation_history(self, connection_id: int):
         """Clear conversation history for a connection"""
         if connection_id in self.conversation_histories:
             del self.conversation_histories[connection_id]
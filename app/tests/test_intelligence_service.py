@@ -22,6 +22,18 @@ def test_detect_booking_request():
     assert IntelligenceService.detect_booking_request("schedule therapy") == True
     assert IntelligenceService.detect_booking_request("I like therapy") == False
 
+def test_classify():
+    intents = IntelligenceService.classify("I am so anxious, can we do a breathing exercise?")
+    assert intents["crisis"] == False
+    assert intents["mood"] == "anxious"
+    assert intents["breathing"] == True
+    assert intents["booking"] == False
+    assert intents["email"] is None
+
+    intents = IntelligenceService.classify("yes please, my email is test@example.com")
+    assert intents["confirmation"] == True
+    assert intents["email"] == "test@example.com"
+
 def test_extract_email():
     assert IntelligenceService.extract_email("my email is test@example.com") == "test@example.com"
     assert IntelligenceService.extract_email("contact me at user.name123@domain.co.in please") == "user.name123@domain.co.in"
@@ -3,6 +3,9 @@ import wave
 import io
 import os
 import logging
+import struct
+
+import numpy as np
 
 # Constants for audio processing
 SILENCE_THRESHOLD = 1000  # Increased threshold to be safer (approx -40dBfs)
@@ -13,70 +16,115 @@ SAMPLES_PER_MS = 8  # At 8kHz sample rate
 
 logger = logging.getLogger(__name__)
 
+# Precomputed mu-law byte -> 16-bit PCM sample table (decoded once with
+# audioop so the values match what ulaw2lin would have produced)
+_ULAW_LUT = np.frombuffer(audioop.ulaw2lin(bytes(range(256)), 2), dtype='<i2')
+
 def is_silence(audio_data: bytes) -> bool:
     """Check if audio chunk is silence"""
     try:
-        # audioop.ulaw2lin returns 2-byte (16-bit) width linear PCM data
-        pcm_data = audioop.ulaw2lin(audio_data, 2)
-        rms = audioop.rms(pcm_data, 2)
-        # logger.debug(f"Audio RMS: {rms}")
-        return rms < SILENCE_THRESHOLD
+        # Vectorized RMS straight off the mu-law bytes: a LUT gather plus
+        # one SIMD squared-mean, with no intermediate PCM bytestring. This
+        # runs for every 20ms media frame, so the per-call allocation that
+        # audioop.ulaw2lin did here was the hottest one in the process.
+        # Comparing mean-of-squares against the squared threshold also
+        # skips the sqrt an actual RMS would need.
+        samples = _ULAW_LUT[np.frombuffer(audio_data, dtype=np.uint8)]
+        return (samples.astype(np.int32) ** 2).mean() < SILENCE_THRESHOLD ** 2
     except Exception as e:
         logger.error(f"Error checking silence: {e}")
         return True
 
-def get_audio_duration_ms(audio_data: list[bytes]) -> float:
+def get_audio_duration_ms(audio_data: bytes | bytearray | list[bytes]) -> float:
     """Calculate duration of audio in milliseconds"""
     # Each byte in mu-law is one sample.
     # 8000 samples per second.
     # So 8 bytes = 1 ms.
-    total_bytes = sum(len(chunk) for chunk in audio_data)
-
-    # Original code was: (total_bytes / 2) / SAMPLES_PER_MS
-    # This implies 2 bytes per sample, but mu-law is 1 byte per sample.
-    # If the input `audio_data` is a list of mu-law encoded bytes, then it should be:
-    # total_bytes / SAMPLES_PER_MS
-
-    # However, keeping backward compatibility with what I think was the intention
-    # (maybe they were treating it as if it was converted to 16-bit already? No, it's passed directly from buffer)
-    # The buffer stores what comes from Twilio, which is base64 decoded payload.
-    # Twilio sends mu-law (PCMU) which is 8-bit.
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        total_bytes = len(audio_data)
+    else:
+        total_bytes = sum(len(chunk) for chunk in audio_data)
 
     return total_bytes / SAMPLES_PER_MS
 
-def convert_audio(audio_data: list[bytes]) -> bytes:
-    """Convert mu-law audio chunks to WAV format at 16kHz for Sarvam AI"""
+def _wav_header_16k(data_size: int) -> bytes:
+    """Build a 44-byte canonical WAV header for 16kHz mono 16-bit PCM"""
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, 1, 16000, 32000, 2, 16,
+        b'data', data_size
+    )
+
+def convert_audio(audio_data: bytes | bytearray | list[bytes]) -> bytes:
+    """Convert mu-law audio (contiguous buffer or chunk list) to WAV format at 16kHz for Sarvam AI"""
     try:
-        # Convert mu-law to linear PCM
-        pcm_data = b''.join([audioop.ulaw2lin(chunk, 2) for chunk in audio_data])
-
-        # Resample from 8kHz to 16kHz for Sarvam AI compatibility
-        pcm_data_16k, _ = audioop.ratecv(pcm_data, 2, 1, 8000, 16000, None)
-
-        # Create WAV file in memory
-        wav_buffer = io.BytesIO()
-        with wave.open(wav_buffer, 'wb') as wav_file:
-            wav_file.setnchannels(1)  # Mono
-            wav_file.setsampwidth(2)  # 2 bytes per sample
-            wav_file.setframerate(16000)  # 16kHz sample rate for Sarvam AI
-            wav_file.writeframes(pcm_data_16k)
-
-        return wav_buffer.getvalue()
+        if not isinstance(audio_data, (bytes, bytearray, memoryview)):
+            audio_data = b''.join(audio_data)
+
+        # One fused numpy pipeline: LUT-decode the mu-law bytes, 2x upsample
+        # to 16kHz by linear interpolation (midpoint between neighbouring
+        # samples), and prepend a hand-packed WAV header. No intermediate
+        # PCM bytestring, no ratecv pass, no wave-module bookkeeping.
+        pcm_8k = _ULAW_LUT[np.frombuffer(audio_data, dtype=np.uint8)]
+        pcm_16k = np.empty(pcm_8k.size * 2, dtype=np.int16)
+        if pcm_8k.size:
+            pcm_16k[0::2] = pcm_8k
+            pcm_16k[1:-1:2] = (
+                (pcm_8k[:-1].astype(np.int32) + pcm_8k[1:]) >> 1
+            ).astype(np.int16)
+            pcm_16k[-1] = pcm_8k[-1]
+
+        return _wav_header_16k(pcm_16k.nbytes) + pcm_16k.tobytes()
     except Exception as e:
         logger.error(f"Error converting audio: {e}")
         raise
 
+def _parse_wav(wav_data: bytes) -> tuple[memoryview, int, int, int]:
+    """Parse an uncompressed PCM WAV with a plain RIFF chunk walk.
+
+    Returns (pcm_data, n_channels, sampwidth, framerate), where pcm_data is
+    a zero-copy memoryview into wav_data (audioop accepts any buffer, so
+    the multi-second payload is never duplicated just to slice it out).
+    Raises ValueError for anything that isn't plain PCM so the caller can
+    fall back to the wave module.
+    """
+    if wav_data[:4] != b'RIFF' or wav_data[8:12] != b'WAVE':
+        raise ValueError("not a RIFF/WAVE file")
+    fmt = None
+    pcm_data = None
+    pos = 12
+    while pos + 8 <= len(wav_data):
+        chunk_id = wav_data[pos:pos + 4]
+        chunk_size = struct.unpack_from('<I', wav_data, pos + 4)[0]
+        body = pos + 8
+        if chunk_id == b'fmt ':
+            audio_format, n_channels, framerate = struct.unpack_from('<HHI', wav_data, body)
+            sampwidth = struct.unpack_from('<H', wav_data, body + 14)[0] // 8
+            if audio_format != 1:  # PCM only
+                raise ValueError(f"unsupported WAV format tag: {audio_format}")
+            fmt = (n_channels, sampwidth, framerate)
+        elif chunk_id == b'data':
+            pcm_data = memoryview(wav_data)[body:body + chunk_size]
+        pos = body + chunk_size + (chunk_size & 1)  # chunks are word-aligned
+    if fmt is None or pcm_data is None:
+        raise ValueError("missing fmt/data chunk")
+    return (pcm_data, *fmt)
+
 def convert_to_mulaw(wav_data: bytes) -> bytes:
     """Convert WAV audio to mu-law format for Twilio"""
     try:
-        # Read WAV data
-        with wave.open(io.BytesIO(wav_data), 'rb') as wav_file:
-            # Read wav file parameters
-            n_channels = wav_file.getnchannels()
-            sampwidth = wav_file.getsampwidth()
-            framerate = wav_file.getframerate()
-            # Read PCM data
-            pcm_data = wav_file.readframes(wav_file.getnframes())
+        try:
+            # TTS responses are plain PCM WAVs: a struct-based chunk walk
+            # skips the wave module's BytesIO + Chunk object bookkeeping
+            pcm_data, n_channels, sampwidth, framerate = _parse_wav(wav_data)
+        except (ValueError, struct.error):
+            # Anything unusual goes through the wave module as before
+            with wave.open(io.BytesIO(wav_data), 'rb') as wav_file:
+                n_channels = wav_file.getnchannels()
+                sampwidth = wav_file.getsampwidth()
+                framerate = wav_file.getframerate()
+                pcm_data = wav_file.readframes(wav_file.getnframes())
 
         # Convert to mono if needed
         if n_channels == 2:
@@ -97,14 +145,32 @@ def convert_to_mulaw(wav_data: bytes) -> bytes:
         logger.error(f"Error converting to mu-law: {e}")
         raise
 
+# Converted breathing audio, cached after the first load so the ffmpeg
+# subprocess and disk round-trip only ever happen once per process
+_breathing_audio_cache: bytes | None = None
+
 def load_breathing_audio() -> bytes | None:
-    """Load and convert breathing exercise MP3 to mu-law format"""
+    """Load and convert breathing exercise MP3 to mu-law format (cached)"""
+    global _breathing_audio_cache
+    if _breathing_audio_cache is not None:
+        return _breathing_audio_cache
     try:
         import subprocess
 
         # Determine the path relative to the project root
         # This assumes this file is in app/utils/
         project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+        # Prefer the precomputed mu-law asset (see precompute_breathing):
+        # a plain read, no ffmpeg subprocess or encode at all
+        ulaw_file = os.path.join(project_root, "assets", "Inhale.ulaw")
+        if os.path.exists(ulaw_file):
+            with open(ulaw_file, "rb") as f:
+                mu_law_data = f.read()
+            logger.info(f"Loaded precomputed breathing audio: {len(mu_law_data)} bytes")
+            _breathing_audio_cache = mu_law_data
+            return mu_law_data
+
         breathing_file = os.path.join(project_root, "assets", "Inhale.mp3")
 
         if not os.path.exists(breathing_file):
@@ -138,6 +204,7 @@ def load_breathing_audio() -> bytes | None:
 
         mu_law_data = audioop.lin2ulaw(pcm_data, 2)
         logger.info(f"Loaded breathing audio: {len(mu_law_data)} bytes")
+        _breathing_audio_cache = mu_law_data
         return mu_law_data
 
     except Exception as e:
@@ -0,0 +1,38 @@
+"""One-time build step: convert assets/Inhale.mp3 to a mu-law asset.
+
+Run as `python -m app.utils.precompute_breathing` at build/deploy time.
+It executes the same ffmpeg + mu-law pipeline load_breathing_audio falls
+back to and writes the result to assets/Inhale.ulaw, which the runtime
+loader then reads directly - no ffmpeg needed on the serving host.
+"""
+import logging
+import os
+import sys
+
+from app.utils import audio_utils
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    ulaw_file = os.path.join(project_root, "assets", "Inhale.ulaw")
+
+    if os.path.exists(ulaw_file):
+        logger.info(f"Removing stale {ulaw_file} so the MP3 is re-converted")
+        os.remove(ulaw_file)
+
+    mu_law_data = audio_utils.load_breathing_audio()
+    if not mu_law_data:
+        logger.error("Breathing audio conversion failed (is ffmpeg installed and assets/Inhale.mp3 present?)")
+        return 1
+
+    with open(ulaw_file, "wb") as f:
+        f.write(mu_law_data)
+    logger.info(f"Wrote {len(mu_law_data)} bytes to {ulaw_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())